@@ -5,23 +5,36 @@ Grade 8 Coding Club Project - NLS
 Automatically opens web interface and updates it with results
 """
 
+import errno
+import hashlib
+import io
 import json
+import os
+import sys
 import webbrowser
 import time
 import threading
-from http.server import HTTPServer, SimpleHTTPRequestHandler
-import socket
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+LIQUID_DESCRIPTION = "LIQUID state! Temperature is between freezing and boiling points"
 
 
 class LiquidAnalyzer:
     def __init__(self):
         print("🧪 Starting Liquid State Analyzer...")
         self.liquids_data = self.load_liquid_data()
+        self._result_templates = self._build_result_templates(self.liquids_data)
+        # Read-only view so callers can't change the cached menu
+        self._available_liquids = MappingProxyType(
+            {key: liquid["name"] for key, liquid in self.liquids_data.items()}
+        )
 
     def load_liquid_data(self):
         try:
-            with open("liquids_data.json", "r", encoding="utf-8") as file:
-                data = json.load(file)
+            with open("liquids_data.json", "rb") as file:
+                data = json.loads(file.read())
             print("✅ Loaded liquid data from liquids_data.json")
             return data
         except FileNotFoundError:
@@ -59,55 +72,102 @@ class LiquidAnalyzer:
             },
         }
 
+    def get_available_liquids(self):
+        """Return a read-only {key: display name} map of the liquids to analyze"""
+        return self._available_liquids
+
     def save_liquid_data(self, data):
-        with open("liquids_data.json", "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=2)
+        with open("liquids_data.json", "wb") as file:
+            file.write(json.dumps(data, indent=2).encode("utf-8"))
         print("💾 Saved liquid data to liquids_data.json")
 
+    @staticmethod
+    def _build_result_templates(data):
+        """Pre-fill the parts of each liquid's result that never change"""
+        templates = {}
+        for key, liquid in data.items():
+            templates[key] = {
+                "liquid_name": liquid["name"],
+                "temperature": None,
+                "pressure": None,
+                "state": None,
+                "flask_state": None,
+                "description": None,
+                "freezing_point": liquid["freezing_point"],
+                "boiling_point_normal": liquid["boiling_point"],
+                "boiling_point_actual": None,
+            }
+        return templates
+
     def calculate_pressure_effect(self, base_boiling_point, pressure):
         pressure_difference = pressure - 1.0
         adjusted_boiling = base_boiling_point + (pressure_difference * 10.0)
         return adjusted_boiling
 
+    @staticmethod
+    def _classify_state(temperature, freezing_point, actual_boiling_point):
+        if temperature <= freezing_point:
+            return "SOLID"
+        if temperature >= actual_boiling_point:
+            return "GAS"
+        return "LIQUID"
+
     def analyze_liquid_state(self, temperature, pressure, liquid_type):
-        if liquid_type not in self.liquids_data:
+        template = self._result_templates.get(liquid_type)
+        if template is None:
             raise ValueError(f"Unknown liquid: {liquid_type}")
         if pressure <= 0:
             raise ValueError("Pressure must be greater than 0")
 
-        liquid = self.liquids_data[liquid_type]
-        freezing_point = liquid["freezing_point"]
-        base_boiling_point = liquid["boiling_point"]
+        freezing_point = template["freezing_point"]
+        base_boiling_point = template["boiling_point_normal"]
         actual_boiling_point = self.calculate_pressure_effect(
             base_boiling_point, pressure
         )
 
-        if temperature <= freezing_point:
-            state = "SOLID"
+        state = self._classify_state(temperature, freezing_point, actual_boiling_point)
+        if state == "SOLID":
             flask_state = "frozen"
             description = f"FROZEN! Temperature {temperature}°C is at or below freezing point ({freezing_point}°C)"
-        elif temperature >= actual_boiling_point:
-            state = "GAS"
+        elif state == "GAS":
             flask_state = "boiling"
             description = f"BOILING! Temperature {temperature}°C is at or above boiling point ({actual_boiling_point:.1f}°C)"
         else:
-            state = "LIQUID"
             flask_state = "still"
-            description = (
-                f"LIQUID state! Temperature is between freezing and boiling points"
+            description = LIQUID_DESCRIPTION
+
+        results = template.copy()
+        results["temperature"] = temperature
+        results["pressure"] = pressure
+        results["state"] = state
+        results["flask_state"] = flask_state
+        results["description"] = description
+        results["boiling_point_actual"] = round(actual_boiling_point, 1)
+        return results
+
+    def analyze_batch(self, temperatures, pressures, liquid_type):
+        """Classify many temperature/pressure pairs for one liquid at once"""
+        template = self._result_templates.get(liquid_type)
+        if template is None:
+            raise ValueError(f"Unknown liquid: {liquid_type}")
+        if len(temperatures) != len(pressures):
+            raise ValueError("Need one pressure for every temperature")
+
+        freezing_point = template["freezing_point"]
+        base_boiling_point = template["boiling_point_normal"]
+
+        results = []
+        for temperature, pressure in zip(temperatures, pressures):
+            if pressure <= 0:
+                raise ValueError("Pressure must be greater than 0")
+            actual_boiling_point = self.calculate_pressure_effect(
+                base_boiling_point, pressure
             )
-
-        return {
-            "liquid_name": liquid["name"],
-            "temperature": temperature,
-            "pressure": pressure,
-            "state": state,
-            "flask_state": flask_state,
-            "description": description,
-            "freezing_point": freezing_point,
-            "boiling_point_normal": base_boiling_point,
-            "boiling_point_actual": round(actual_boiling_point, 1),
-        }
+            state = self._classify_state(
+                temperature, freezing_point, actual_boiling_point
+            )
+            results.append((state, round(actual_boiling_point, 1)))
+        return results
 
     def save_results_for_web(self, results):
         """Save results in a format the web page can read"""
@@ -120,24 +180,128 @@ class LiquidAnalyzer:
             "description": results["description"],
             "timestamp": time.time(),
         }
-        with open("current_results.json", "w") as file:
-            json.dump(web_results, file, indent=2)
+        # Write to a temp file and swap it in so a reader never sees half a file.
+        # The pid in the name keeps two runs in the same folder from colliding.
+        data = json.dumps(web_results, indent=2).encode("utf-8")
+        temp_path = f"current_results.json.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, "current_results.json")
+        except PermissionError:
+            # Windows refuses the swap while another program has the file open,
+            # so fall back to overwriting it in place like before
+            with open("current_results.json", "wb") as file:
+                file.write(data)
+        finally:
+            # Only still there if the swap didn't happen
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
         print("🌐 Results updated for web interface")
 
 
+class WebHandler(SimpleHTTPRequestHandler):
+    # Headers and body go out as separate small writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+
+    # (path, mtime_ns, bytes, etag) of the last index.html read, shared by all requests
+    index_cache = (None, None, None, None)
+
+    def load_index(self):
+        """Return (bytes, etag) for index.html, only re-reading it when it changes"""
+        path = os.path.join(self.directory, "index.html")
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            cached_path, cached_mtime, body, etag = WebHandler.index_cache
+            if (cached_path, cached_mtime) != (path, mtime):
+                with open(path, "rb") as file:
+                    body = file.read()
+                etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+                WebHandler.index_cache = (path, mtime, body, etag)
+        except FileNotFoundError:
+            return None, None
+        return body, etag
+
+    def etag_matches(self, etag):
+        """Check If-None-Match, which may be "*" or a comma-separated list of tags"""
+        header = self.headers.get("If-None-Match")
+        if header is None:
+            return False
+        if header.strip() == "*":
+            return True
+        # If-None-Match uses weak comparison, so W/"abc" matches "abc"
+        tags = (tag.strip() for tag in header.split(","))
+        return any(tag.removeprefix("W/") == etag for tag in tags)
+
+    def is_index_request(self):
+        return urlsplit(self.path).path in ("/", "/index.html")
+
+    def send_index(self, include_body):
+        """Answer a request for index.html from the cache, False if there's no file"""
+        body, etag = self.load_index()
+        if body is None:
+            return False
+        # The browser already has this version, so skip sending it again
+        not_modified = self.etag_matches(etag)
+        if not_modified:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header("Content-type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # no-cache still lets the browser keep it, it just checks the ETag first
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if include_body and not not_modified:
+            self.wfile.write(body)
+        return True
+
+    def do_GET(self):
+        if self.is_index_request() and self.send_index(include_body=True):
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        if self.is_index_request() and self.send_index(include_body=False):
+            return
+        super().do_HEAD()
+
+    def copyfile(self, source, outputfile):
+        """Send file bodies with sendfile() so they skip the Python copy loop"""
+        # sendfile() writes straight to the socket, which is only safe while wfile
+        # is unbuffered (wbufsize = 0) and the source is a real file on disk.
+        # Anything else, like a directory listing, takes the normal copy path.
+        if (
+            self.wbufsize == 0
+            and outputfile is self.wfile
+            and isinstance(source, io.BufferedReader)
+        ):
+            self.connection.sendfile(source)
+        else:
+            super().copyfile(source, outputfile)
+
+
+class WebServer(ThreadingHTTPServer):
+    # On Windows SO_REUSEADDR lets a second server bind a port that is already
+    # being listened on, so only turn it on elsewhere
+    allow_reuse_address = os.name != "nt"
+
+
 def start_local_server():
     """Start a simple web server to serve the HTML files"""
     port = 8000
     try:
-        # Check if port is available
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            result = s.connect_ex(("localhost", port))
-            if result == 0:
+        # Binding fails straight away if the port is taken, no probe needed
+        try:
+            httpd = WebServer(("", port), WebHandler)
+        except OSError as e:
+            if e.errno == errno.EADDRINUSE:
                 print(f"⚠️ Port {port} already in use")
                 return None
-
-        handler = SimpleHTTPRequestHandler
-        httpd = HTTPServer(("", port), handler)
+            raise
         print(f"🌐 Web server starting on http://localhost:{port}")
 
         # Start server in background thread
@@ -151,58 +315,63 @@ def start_local_server():
 
 def display_results(results):
     """Display results in terminal"""
-    print("\n🧪 LIQUID STATE ANALYSIS RESULTS 🧪")
-    print("=" * 50)
-    print(
-        f"🔬 {results['liquid_name']} | 🌡️ {results['temperature']}°C | 📏 {results['pressure']} atm"
-    )
-    print(f"🏷️ STATE: {results['state']}")
-    print(f"📖 {results['description']}")
-    print("=" * 50)
+    lines = [
+        "\n🧪 LIQUID STATE ANALYSIS RESULTS 🧪",
+        "=" * 50,
+        f"🔬 {results['liquid_name']} | 🌡️ {results['temperature']}°C | 📏 {results['pressure']} atm",
+        f"🏷️ STATE: {results['state']}",
+        f"📖 {results['description']}",
+        "=" * 50,
+    ]
+    # One write instead of a print() per line
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def prompt_number(
+    prompt, convert=float, default=None, is_valid=None, error_message=None
+):
+    """Keep asking until the user types a number that passes is_valid"""
+    while True:
+        text = input(prompt)
+        if default is not None and text.strip() == "":
+            number = default
+        else:
+            try:
+                number = convert(text)
+            except ValueError:
+                print("❌ Please enter a valid number")
+                continue
+        if is_valid is None or is_valid(number):
+            return number
+        print(error_message)
 
 
 def get_user_input(analyzer):
     """Get input from user"""
     print("\n🎯 Let's analyze a liquid state!")
-    liquids = analyzer.liquids_data
+    liquids = analyzer.get_available_liquids()
     print("📋 Available liquids:")
     liquid_list = list(liquids.keys())
     for i, liquid_key in enumerate(liquid_list, 1):
-        liquid_info = liquids[liquid_key]
-        print(f" {i}. {liquid_info['name']}")
+        print(f" {i}. {liquids[liquid_key]}")
 
-    while True:
-        try:
-            choice = input(f"\n🔤 Choose a liquid (1-{len(liquid_list)}): ")
-            choice_num = int(choice)
-            if 1 <= choice_num <= len(liquid_list):
-                liquid_type = liquid_list[choice_num - 1]
-                break
-            else:
-                print(f"❌ Please enter a number between 1 and {len(liquid_list)}")
-        except ValueError:
-            print("❌ Please enter a valid number")
+    choice_num = prompt_number(
+        f"\n🔤 Choose a liquid (1-{len(liquid_list)}): ",
+        convert=int,
+        is_valid=lambda number: 1 <= number <= len(liquid_list),
+        error_message=f"❌ Please enter a number between 1 and {len(liquid_list)}",
+    )
+    liquid_type = liquid_list[choice_num - 1]
 
-    while True:
-        try:
-            temperature = float(input("🌡️ Enter temperature in Celsius: "))
-            break
-        except ValueError:
-            print("❌ Please enter a valid number")
+    temperature = prompt_number("🌡️ Enter temperature in Celsius: ")
 
-    while True:
-        try:
-            pressure_input = input("📏 Enter pressure in atm (press Enter for 1.0): ")
-            if pressure_input.strip() == "":
-                pressure = 1.0
-            else:
-                pressure = float(pressure_input)
-            if pressure > 0:
-                break
-            else:
-                print("❌ Pressure must be greater than 0")
-        except ValueError:
-            print("❌ Please enter a valid number")
+    pressure = prompt_number(
+        "📏 Enter pressure in atm (press Enter for 1.0): ",
+        default=1.0,
+        is_valid=lambda number: number > 0,
+        error_message="❌ Pressure must be greater than 0",
+    )
 
     return temperature, pressure, liquid_type
 
@@ -0,0 +1,119 @@
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+
+from liquid_analyzer import LiquidAnalyzer, WebHandler, WebServer
+
+
+class AnalyzeBatchTest(unittest.TestCase):
+    def setUp(self):
+        # Run in an empty folder so the analyzer uses its default liquids
+        self.old_cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.analyzer = LiquidAnalyzer()
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        self.temp_dir.cleanup()
+
+    def test_matches_single_analysis(self):
+        temperatures = [-5, 0, 50, 99, 100, 150]
+        pressures = [1, 1, 1, 0.5, 1, 2.5]
+        batch = self.analyzer.analyze_batch(temperatures, pressures, "water")
+        for (state, boiling_point), temperature, pressure in zip(
+            batch, temperatures, pressures
+        ):
+            single = self.analyzer.analyze_liquid_state(temperature, pressure, "water")
+            self.assertEqual(state, single["state"])
+            self.assertEqual(boiling_point, single["boiling_point_actual"])
+
+    def test_length_mismatch_raises(self):
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze_batch([50, -5, 105], [1], "water")
+
+
+class QuietHandler(WebHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class WebHandlerTest(unittest.TestCase):
+    INDEX = b"<h1>Liquid State Analyzer</h1>"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.temp_dir.name, "index.html"), "wb") as file:
+            file.write(self.INDEX)
+        handler = partial(QuietHandler, directory=self.temp_dir.name)
+        # Port 0 lets the OS pick a free port
+        self.server = WebServer(("127.0.0.1", 0), handler)
+        threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def request(self, method, path, headers=None):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_get_serves_index(self):
+        for path in ("/", "/index.html", "/index.html?x=1"):
+            with self.subTest(path=path):
+                response, body = self.request("GET", path)
+                self.assertEqual(response.status, 200)
+                self.assertEqual(body, self.INDEX)
+                self.assertEqual(
+                    response.getheader("Content-type"), "text/html; charset=utf-8"
+                )
+
+    def test_head_matches_get(self):
+        get_response, _ = self.request("GET", "/")
+        head_response, head_body = self.request("HEAD", "/")
+        self.assertEqual(head_body, b"")
+        get_headers = dict(get_response.getheaders())
+        head_headers = dict(head_response.getheaders())
+        get_headers.pop("Date")
+        head_headers.pop("Date")
+        self.assertEqual(head_headers, get_headers)
+
+    def test_get_sends_etag(self):
+        response, _ = self.request("GET", "/")
+        self.assertTrue(response.getheader("ETag"))
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+
+    def test_matching_etag_returns_304(self):
+        response, _ = self.request("GET", "/")
+        etag = response.getheader("ETag")
+        for header in (etag, "W/" + etag, '"other", ' + etag, "*"):
+            for method in ("GET", "HEAD"):
+                with self.subTest(header=header, method=method):
+                    response, body = self.request(
+                        method, "/", {"If-None-Match": header}
+                    )
+                    self.assertEqual(response.status, 304)
+                    self.assertEqual(body, b"")
+                    self.assertEqual(response.getheader("ETag"), etag)
+                    self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+
+    def test_other_etag_returns_200(self):
+        response, body = self.request("GET", "/", {"If-None-Match": '"other"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.INDEX)
+
+
+if __name__ == "__main__":
+    unittest.main()